@@ -6,7 +6,1391 @@ import threading
 from pathlib import Path
 import queue
 import time
+import re
+import json
+import array
+import heapq
+import argparse
+import itertools
+import socketserver
+import shutil
+import tempfile
+import wave
+import mmap
+import struct
+import tarfile
+import zipfile
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 支持的目标格式及输出扩展名
+SUPPORTED_FORMATS = {
+    'FLAC': '.flac',
+    'MP3': '.mp3',
+    'WAV': '.wav',
+    'OGG': '.ogg',
+    'AAC': '.aac',
+    'M4A': '.m4a',
+    'WMA': '.wma',
+    'AIFF': '.aiff',
+    'ALAC': '.m4a'
+}
+
+# 可选的输出质量
+QUALITY_OPTIONS = ['64k', '128k', '192k', '256k', '320k', '无损']
+
+# 支持的音频扩展名
+AUDIO_EXTENSIONS = {'.flac', '.mp3', '.wav', '.ogg', '.aac', '.m4a', '.wma', '.aiff'}
+
+# 支持直接读取的压缩包类型
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# 向FFmpeg管道写入时的块大小，保证内存占用有上限
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def is_archive(path):
+    """判断文件是否为支持的压缩包"""
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def is_compressed_tar(path):
+    """判断tar是否经过gzip/bzip2/xz压缩（此时只能顺序读取）"""
+    with open(path, 'rb') as f:
+        magic = f.read(6)
+    return magic.startswith((b'\x1f\x8b', b'BZh', b'\xfd7zXZ\x00'))
+
+
+def list_archive_audio(archive_path):
+    """列出压缩包内的音频成员，返回 [(成员名, 字节数, 数据偏移), ...]
+    
+    数据偏移仅对未压缩tar有效，其余情况为None。
+    """
+    members = []
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and Path(info.filename).suffix.lower() in AUDIO_EXTENSIONS:
+                    members.append((info.filename, info.file_size, None))
+    else:
+        compressed = is_compressed_tar(archive_path)
+        with tarfile.open(archive_path, 'r:*') as tf:
+            for info in tf:
+                if info.isfile() and Path(info.name).suffix.lower() in AUDIO_EXTENSIONS:
+                    offset = None if compressed or info.issparse() else info.offset_data
+                    members.append((info.name, info.size, offset))
+    return members
+
+
+def archive_member_url(archive_path, offset, size):
+    """未压缩tar成员的FFmpeg subfile地址：直接读取包内数据区，输入可随机访问"""
+    return f"subfile,,start,{offset},end,{offset + size},,:{archive_path}"
+
+
+def archive_output_path(output_dir, member, suffix):
+    """压缩包成员的输出路径：保留成员在包内的相对目录，避免不同目录下的同名文件互相覆盖"""
+    parts = [part for part in member.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    return Path(output_dir, *parts).with_suffix(suffix)
+
+
+@contextmanager
+def open_archive_member(archive_path, member):
+    """以流的方式打开压缩包成员（不解压到磁盘）"""
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf, zf.open(member) as stream:
+            yield stream
+        return
+    
+    with tarfile.open(archive_path, 'r:*') as tf:
+        # 逐个遍历到目标成员即停止，避免getmember()扫描整个压缩包
+        for info in tf:
+            if info.name == member and info.isfile():
+                with tf.extractfile(info) as stream:
+                    yield stream
+                return
+    raise FileNotFoundError(f"压缩包中不存在: {member}")
+
+
+class TarMemberStream:
+    """顺序读取器交给消费者的单个成员数据流，缓冲有上限"""
+    
+    def __init__(self, max_chunks, reader):
+        self.chunks = queue.Queue(maxsize=max_chunks)
+        self.ready = threading.Event()
+        self.closed = threading.Event()
+        self.done = False
+        self.buffer = b''
+        self.finished = False
+        self.reader = reader
+        self.claimed = False
+        self.prefetched = False
+    
+    def claim(self):
+        """标记已有消费者，归还读取器的预读名额"""
+        self.reader.release_prefetch(self)
+    
+    def put(self, chunk):
+        """读取线程写入数据块；消费者已关闭时返回False"""
+        while not self.closed.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.2)
+            except queue.Full:
+                continue
+            self.ready.set()
+            return True
+        return False
+    
+    def finish(self, error=None):
+        """读取线程写入结束标记（或错误）"""
+        self.done = True
+        self.put(error)
+        self.ready.set()
+    
+    def wait_ready(self):
+        """等待读取器到达本成员"""
+        while not self.ready.wait(0.2):
+            if self.closed.is_set():
+                return
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = [self.buffer]
+            self.buffer = b''
+            while True:
+                chunk = self.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return b''.join(parts)
+                parts.append(chunk)
+        
+        while not self.buffer and not self.finished:
+            # 读取器被停止后不会再写入任何数据，轮询以免消费者永远阻塞
+            try:
+                chunk = self.chunks.get(timeout=0.2)
+            except queue.Empty:
+                if self.closed.is_set():
+                    raise OSError("压缩包读取已停止")
+                continue
+            if chunk is None:
+                self.finished = True
+            elif isinstance(chunk, Exception):
+                self.finished = True
+                raise OSError(f"读取压缩包失败: {chunk}")
+            else:
+                self.buffer = chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+    
+    def close(self):
+        """消费者结束；未读完的数据由读取器跳过"""
+        self.closed.set()
+        self.claim()
+
+
+class TarStreamReader:
+    """压缩tar只解压一遍：后台线程按包内顺序把所需成员逐个交给消费者
+    
+    每个成员最多缓冲 max_chunks 个数据块，尚无消费者的成员最多预读
+    max_ahead 个，因此内存占用与压缩包大小无关。消费者应按包内顺序领取成员。
+    """
+    
+    def __init__(self, archive_path, members, max_chunks=32, max_ahead=4):
+        self.max_ahead = max_ahead
+        self.prefetching = 0
+        self.condition = threading.Condition()
+        self.stopped = threading.Event()
+        self.streams = {member: TarMemberStream(max_chunks, self) for member in members}
+        self.thread = threading.Thread(target=self.run, args=(archive_path,), daemon=True)
+        self.thread.start()
+    
+    def take(self, member):
+        """领取成员的数据流"""
+        stream = self.streams[member]
+        stream.claim()
+        return stream
+    
+    def close(self):
+        """停止读取，所有未完成的成员都会结束"""
+        self.stopped.set()
+        with self.condition:
+            self.condition.notify_all()
+        for stream in self.streams.values():
+            stream.close()
+    
+    def acquire_prefetch(self, stream):
+        """开始读取尚无消费者的成员前占用预读名额；读取器被停止时返回False"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.stopped.is_set() or stream.claimed
+                                    or self.prefetching < self.max_ahead)
+            if self.stopped.is_set():
+                return False
+            if not stream.claimed:
+                stream.prefetched = True
+                self.prefetching += 1
+            return True
+    
+    def release_prefetch(self, stream):
+        """成员被领取或关闭时归还名额"""
+        with self.condition:
+            if stream.claimed:
+                return
+            stream.claimed = True
+            if stream.prefetched:
+                self.prefetching -= 1
+            self.condition.notify_all()
+    
+    def run(self, archive_path):
+        error = None
+        try:
+            with tarfile.open(archive_path, 'r|*') as tf:
+                for info in tf:
+                    stream = self.streams.get(info.name)
+                    if stream is None or stream.done or not info.isfile():
+                        continue
+                    # 限制尚无消费者的预读成员数
+                    if not self.acquire_prefetch(stream):
+                        return
+                    
+                    source = tf.extractfile(info)
+                    while True:
+                        chunk = source.read(STREAM_CHUNK_SIZE)
+                        if not chunk or not stream.put(chunk):
+                            break
+                    stream.finish()
+        except (tarfile.TarError, OSError, EOFError) as e:
+            error = e
+        finally:
+            for member, stream in self.streams.items():
+                if not stream.done:
+                    stream.finish(error or FileNotFoundError(f"压缩包中不存在: {member}"))
+
+
+def start_stdin_feeder(process, source):
+    """启动后台线程把source分块写入进程标准输入，写完后关闭管道"""
+    def feed():
+        try:
+            shutil.copyfileobj(source, process.stdin, STREAM_CHUNK_SIZE)
+        except OSError:
+            # FFmpeg提前退出时管道会断开，错误信息由返回码体现
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+    
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    return feeder
+
+
+def run_ffmpeg_piped(cmd, source, timeout=300):
+    """运行FFmpeg并将source分块写入其标准输入，返回 (返回码, 错误输出)"""
+    process = subprocess.Popen(cmd,
+                               stdin=subprocess.PIPE,
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE)
+    timed_out = threading.Event()
+    
+    def kill():
+        timed_out.set()
+        process.kill()
+    
+    feeder = start_stdin_feeder(process, source)
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        stderr = process.stderr.read()
+        process.wait()
+    finally:
+        timer.cancel()
+        feeder.join()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return process.returncode, stderr.decode('utf-8', errors='replace')
+
+
+def run_ffmpeg_monitored(cmd, on_progress=None, cancel_event=None, source=None):
+    """运行FFmpeg并解析 -progress 输出，可随时取消，返回 (返回码, 错误输出)
+    
+    on_progress 以已编码的秒数回调；cancel_event 被设置后进程会被终止。
+    """
+    cmd = cmd[:1] + ['-progress', 'pipe:1', '-nostats'] + cmd[1:]
+    process = subprocess.Popen(cmd,
+                               stdin=subprocess.PIPE if source is not None else subprocess.DEVNULL,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()),
+                                     daemon=True)
+    stderr_reader.start()
+    feeder = start_stdin_feeder(process, source) if source is not None else None
+    
+    def watch():
+        while process.poll() is None:
+            if cancel_event is not None and cancel_event.wait(0.2):
+                process.kill()
+                return
+            if cancel_event is None:
+                time.sleep(0.2)
+    
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    
+    for raw_line in process.stdout:
+        key, _, value = raw_line.decode('utf-8', errors='replace').strip().partition('=')
+        # out_time_ms 历史上实际也以微秒为单位
+        if key in ('out_time_us', 'out_time_ms') and value.isdigit() and on_progress:
+            on_progress(int(value) / 1_000_000)
+    
+    process.wait()
+    stderr_reader.join()
+    watcher.join()
+    if feeder is not None:
+        feeder.join()
+    return process.returncode, b''.join(stderr_chunks).decode('utf-8', errors='replace')
+
+
+def ffmpeg_output_empty(stderr):
+    """FFmpeg返回0却没有编码出任何音频（如MP4/M4A从管道读取时无法定位到moov）"""
+    if 'Output file is empty' in stderr:
+        return True
+    times = re.findall(r'time=(\S+)', stderr)
+    return bool(times) and times[-1] == 'N/A'
+
+
+def parse_ffmpeg_duration(stderr):
+    """从FFmpeg错误输出中取出已编码的音频时长（秒），取不到时返回None
+    
+    只采用最后一行统计信息中的 time=：输入的 Duration: 不代表实际编码了多少，
+    最后为 time=N/A（什么都没编码）时也返回None。
+    """
+    times = re.findall(r'time=(\S+)', stderr)
+    match = re.fullmatch(r'(\d+):(\d+):(\d+(?:\.\d+)?)', times[-1]) if times else None
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return duration if duration > 0 else None
+
+def codec_arguments(target_format, quality):
+    """根据目标格式和质量生成FFmpeg编码参数"""
+    args = []
+    if target_format == 'MP3':
+        args.extend(['-codec:a', 'libmp3lame'])
+        if quality != '无损':
+            args.extend(['-b:a', quality])
+        else:
+            args.extend(['-q:a', '0'])
+    elif target_format == 'WAV':
+        args.extend(['-codec:a', 'pcm_s16le'])
+    elif target_format == 'FLAC':
+        args.extend(['-codec:a', 'flac'])
+        if quality != '无损':
+            args.extend(['-compression_level', '8'])
+    elif target_format == 'OGG':
+        args.extend(['-codec:a', 'libvorbis'])
+        if quality != '无损':
+            quality_map = {'64k': '2', '128k': '4', '192k': '6', '256k': '8', '320k': '10'}
+            args.extend(['-q:a', quality_map.get(quality, '6')])
+    return args
+
+
+def build_ffmpeg_command(input_file, output_file, target_format, quality):
+    """构建FFmpeg命令"""
+    cmd = ['ffmpeg', '-i', str(input_file), '-y', '-hide_banner']
+    cmd.extend(codec_arguments(target_format, quality))
+    cmd.append(str(output_file))
+    return cmd
+
+
+def probe_audio(path):
+    """用ffprobe读取首个音频流的采样率、声道数、时长和精确采样数（未知时为None）"""
+    cmd = ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+           '-show_entries', 'stream=sample_rate,channels,time_base,duration_ts,duration:format=duration',
+           '-of', 'json', str(path)]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe失败: {result.stderr[:100]}")
+    
+    data = json.loads(result.stdout)
+    if not data.get('streams'):
+        raise RuntimeError("未找到音频流")
+    stream = data['streams'][0]
+    sample_rate = int(stream['sample_rate'])
+    duration = float(stream.get('duration') or data.get('format', {}).get('duration') or 0)
+    
+    # 仅当时间基等于1/采样率时duration_ts才是精确采样数
+    samples = None
+    if stream.get('time_base') == f"1/{sample_rate}" and stream.get('duration_ts'):
+        samples = int(stream['duration_ts'])
+        duration = samples / sample_rate
+    
+    return {
+        'sample_rate': sample_rate,
+        'channels': int(stream['channels']),
+        'duration': duration,
+        'samples': samples
+    }
+
+
+def count_decoded_samples(path, timeout=600):
+    """完整解码音频并统计采样数（按单声道8位输出计数，内存占用有上限）"""
+    cmd = ['ffmpeg', '-v', 'error', '-nostdin', '-i', str(path),
+           '-map', '0:a:0', '-ac', '1', '-f', 'u8', '-']
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        samples = 0
+        while True:
+            chunk = process.stdout.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            samples += len(chunk)
+        process.wait()
+    finally:
+        timer.cancel()
+    
+    if process.returncode != 0:
+        raise RuntimeError(f"解码校验失败: {path}")
+    return samples
+
+
+# ========== 吞吐模型与转换计划 ==========
+
+# 本地状态目录（吞吐模型等）
+STATE_DIR = Path.home() / ".audio_converter"
+THROUGHPUT_MODEL_FILE = STATE_DIR / "throughput.json"
+AUTOTUNE_FILE = STATE_DIR / "autotune.json"
+
+# 未学习前的单任务速度先验（音频秒 / 墙钟秒）
+DEFAULT_SPEEDS = {
+    'WAV': 300.0, 'AIFF': 300.0, 'FLAC': 120.0, 'MP3': 50.0, 'OGG': 35.0,
+    'AAC': 45.0, 'M4A': 45.0, 'WMA': 60.0, 'ALAC': 45.0
+}
+
+# 每个文件的进程启动等固定开销（秒）
+PROCESS_OVERHEAD = 0.15
+
+# FLAC相对16位PCM的典型压缩比
+FLAC_RATIO = 0.55
+
+# 未指定码率时FFmpeg编码器的大致码率（kbps）
+DEFAULT_LOSSY_BITRATE = 128
+MP3_VBR0_BITRATE = 245
+OGG_BITRATES = {'64k': 96, '128k': 128, '192k': 192, '256k': 256, '320k': 500, '无损': 112}
+
+# 输出大小随质量变化的格式（见 codec_arguments）
+QUALITY_SENSITIVE_FORMATS = ('MP3', 'OGG')
+
+
+def format_seconds(seconds):
+    """把秒数格式化为 时:分:秒"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_bytes(size):
+    """把字节数格式化为 MB/GB"""
+    if size >= 1024 ** 3:
+        return f"{size / 1024 ** 3:.2f} GB"
+    return f"{size / 1024 ** 2:.1f} MB"
+
+
+class ThroughputModel:
+    """按 格式|质量 学习的吞吐模型：单任务速度和每秒输出字节数，保存在本地"""
+    
+    # 指数平滑系数，新样本的权重
+    SMOOTHING = 0.2
+    
+    def __init__(self, path=THROUGHPUT_MODEL_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        try:
+            self.profiles = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.profiles = {}
+    
+    @staticmethod
+    def key(target_format, quality):
+        return f"{target_format}|{quality}"
+    
+    def record(self, target_format, quality, audio_seconds, wall_seconds, output_bytes):
+        """记录一次成功转换"""
+        if audio_seconds <= 0 or wall_seconds <= 0:
+            return
+        speed = audio_seconds / max(wall_seconds - PROCESS_OVERHEAD, 0.01)
+        rate = output_bytes / audio_seconds
+        
+        with self.lock:
+            profile = self.profiles.get(self.key(target_format, quality))
+            if profile is None:
+                self.profiles[self.key(target_format, quality)] = {
+                    'speed': speed, 'bytes_per_second': rate, 'runs': 1
+                }
+                return
+            alpha = self.SMOOTHING
+            profile['speed'] += alpha * (speed - profile['speed'])
+            profile['bytes_per_second'] += alpha * (rate - profile['bytes_per_second'])
+            profile['runs'] += 1
+    
+    def speed(self, target_format, quality):
+        """单个任务每墙钟秒处理的音频秒数"""
+        with self.lock:
+            profile = self.profiles.get(self.key(target_format, quality))
+        if profile:
+            return profile['speed']
+        return DEFAULT_SPEEDS.get(target_format, 50.0)
+    
+    def bytes_per_second(self, target_format, quality, sample_rate=44100, channels=2):
+        """每秒音频的输出字节数，未学习时按编码参数估算"""
+        with self.lock:
+            profile = self.profiles.get(self.key(target_format, quality))
+        if profile:
+            return profile['bytes_per_second']
+        
+        pcm = sample_rate * channels * 2
+        if target_format in ('WAV', 'AIFF'):
+            return pcm
+        if target_format == 'FLAC':
+            return pcm * FLAC_RATIO
+        if target_format == 'MP3':
+            kbps = MP3_VBR0_BITRATE if quality == '无损' else int(quality[:-1])
+        elif target_format == 'OGG':
+            kbps = OGG_BITRATES.get(quality, DEFAULT_LOSSY_BITRATE)
+        else:
+            kbps = DEFAULT_LOSSY_BITRATE
+        return kbps * 1000 / 8
+    
+    def save(self):
+        """原子地写回本地文件"""
+        with self.lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp = self.path.with_suffix('.tmp')
+                temp.write_text(json.dumps(self.profiles, ensure_ascii=False, indent=2),
+                                encoding='utf-8')
+                os.replace(temp, self.path)
+            except OSError:
+                pass
+
+
+def estimate_wall_time(durations, speed, workers):
+    """按最长任务优先分配给工作线程，返回预计总耗时（秒）
+    
+    超过CPU核数的并发只会分摊算力，因此并行通道数以核数为上限。
+    """
+    lanes = [0.0] * max(1, min(workers, os.cpu_count() or 1))
+    for duration in sorted(durations, reverse=True):
+        heapq.heapreplace(lanes, lanes[0] + duration / speed + PROCESS_OVERHEAD)
+    return max(lanes)
+
+
+# ========== 并发自动调节 ==========
+
+class ConcurrencyLimiter:
+    """上限可动态调整的并发闸门；关闭后所有等待者立即返回False"""
+    
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.closed = False
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or self.active < self.limit)
+            if self.closed:
+                return False
+            self.active += 1
+            return True
+    
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+    
+    def set_limit(self, limit):
+        with self.condition:
+            self.limit = limit
+            self.condition.notify_all()
+    
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class ConcurrencyAutotuner:
+    """闭环并发调节器
+    
+    以"音频秒 / 墙钟秒"的聚合吞吐为目标做爬山：增加并发只有在吞吐提升
+    超过 TOLERANCE 时才继续；遇到平台或下降就转而尝试减少并发，只要
+    吞吐不明显下降就继续减少，之后停在满足条件的最小并发数上，每隔
+    RECHECK_WINDOWS 个窗口再向上试探一次。保存的是吞吐与最佳值相差
+    不超过 TOLERANCE 的最小并发数，下次同配置的批次直接从该值起步。
+    """
+    
+    # 测量窗口至少持续的秒数（窗口内还需完成不少于当前并发数的文件）
+    WINDOW = 8.0
+    
+    # 吞吐变化不超过该比例视为持平，避免噪声导致来回抖动
+    TOLERANCE = 0.05
+    
+    # 收敛后每隔多少个窗口向上试探一次，以适应负载变化
+    RECHECK_WINDOWS = 6
+    
+    def __init__(self, limiter, profile, max_workers, initial, on_change=None, path=AUTOTUNE_FILE):
+        self.limiter = limiter
+        self.profile = profile
+        self.max_workers = max_workers
+        self.on_change = on_change
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        
+        try:
+            self.saved = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.saved = {}
+        start = self.saved.get(profile, {}).get('workers', initial)
+        start = max(1, min(start, max_workers))
+        limiter.set_limit(start)
+        
+        self.direction = 1
+        self.tried_down = False
+        self.settled = None  # 收敛后经过的窗口数，探索中为None
+        self.samples = {}    # 并发数 -> [吞吐累计, 窗口数]
+        self.reset_window()
+    
+    def reset_window(self):
+        self.window_start = time.time()
+        self.window_audio = 0.0
+        self.window_files = 0
+    
+    def record(self, audio_seconds):
+        """每完成一个文件调用一次"""
+        with self.lock:
+            self.window_audio += audio_seconds
+            self.window_files += 1
+            elapsed = time.time() - self.window_start
+            if elapsed < self.WINDOW or self.window_files < self.limiter.limit:
+                return
+            self.step(self.window_audio / elapsed)
+            self.reset_window()
+    
+    def mean_throughput(self, workers):
+        total, count = self.samples[workers]
+        return total / count
+    
+    def best(self):
+        """返回吞吐与最佳值相差不超过 TOLERANCE 的最小并发数及其吞吐；尚无测量时返回None"""
+        if not self.samples:
+            return None
+        peak = max(self.mean_throughput(w) for w in self.samples)
+        workers = min(w for w in self.samples
+                      if self.mean_throughput(w) >= peak * (1 - self.TOLERANCE))
+        return workers, self.mean_throughput(workers)
+    
+    def step(self, throughput):
+        """根据本窗口吞吐决定下一步的并发数"""
+        current = self.limiter.limit
+        sample = self.samples.setdefault(current, [0.0, 0])
+        sample[0] += throughput
+        sample[1] += 1
+        
+        if self.settled is not None:
+            # 已收敛：保持不动，定期向上试探一次
+            self.settled += 1
+            target = current
+            if self.settled >= self.RECHECK_WINDOWS and current < self.max_workers:
+                self.settled, self.direction, self.tried_down = None, 1, True
+                target = current + 1
+        else:
+            target = self.explore(current, throughput)
+        
+        if target != current:
+            self.limiter.set_limit(target)
+            if self.on_change:
+                self.on_change(current, target, throughput)
+    
+    def explore(self, current, throughput):
+        """探索阶段的一步，返回下一个并发数"""
+        previous = current - self.direction
+        if previous in self.samples:
+            baseline = self.mean_throughput(previous)
+            if self.direction > 0:
+                improved = throughput > baseline * (1 + self.TOLERANCE)
+            else:
+                improved = throughput >= baseline * (1 - self.TOLERANCE)
+            if not improved:
+                if self.direction > 0 and not self.tried_down:
+                    # 加并发没有收益：从更小的并发数往下试，平台可能向下延伸
+                    self.direction, self.tried_down = -1, True
+                    if previous - 1 >= 1 and previous - 1 not in self.samples:
+                        return previous - 1
+                return self.settle()
+        
+        target = current + self.direction
+        if not 1 <= target <= self.max_workers:
+            if self.direction > 0 and not self.tried_down and current > 1:
+                self.direction, self.tried_down = -1, True
+                return current - 1
+            return self.settle()
+        return target
+    
+    def settle(self):
+        """停止探索，停在满足条件的最小并发数上"""
+        self.settled = 0
+        return self.best()[0]
+    
+    def save(self):
+        """保存本配置的最佳并发数"""
+        with self.lock:
+            best = self.best()
+            if best is None:
+                return
+            self.saved[self.profile] = {
+                'workers': best[0],
+                'throughput': round(best[1], 2)
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp = self.path.with_suffix('.tmp')
+                temp.write_text(json.dumps(self.saved, ensure_ascii=False, indent=2),
+                                encoding='utf-8')
+                os.replace(temp, self.path)
+            except OSError:
+                pass
+
+
+
+# ========== PCM→WAV 进程内快速通道 ==========
+
+# 每次转换写出的帧数
+FAST_PATH_CHUNK_FRAMES = 1 << 20
+
+# 可由快速通道读取的源扩展名
+FAST_PATH_EXTENSIONS = ('.wav', '.aiff', '.aif')
+
+# WAVE_FORMAT_PCM / WAVE_FORMAT_IEEE_FLOAT / WAVE_FORMAT_EXTENSIBLE
+WAVE_PCM, WAVE_FLOAT, WAVE_EXTENSIBLE = 0x0001, 0x0003, 0xFFFE
+
+
+def parse_extended_float(data):
+    """解析AIFF中80位扩展精度的采样率"""
+    exponent, mantissa = struct.unpack('>HQ', data)
+    if exponent & 0x7FFF == 0:
+        return 0
+    return round(mantissa * 2.0 ** ((exponent & 0x7FFF) - 16383 - 63))
+
+
+def read_pcm_layout(path):
+    """解析WAV/AIFF头部，返回采样布局和数据区位置；不支持的格式返回None"""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12:
+            return None
+        if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+            chunk_order = '<'
+        elif header[:4] == b'FORM' and header[8:12] in (b'AIFF', b'AIFC'):
+            chunk_order = '>'
+        else:
+            return None
+        
+        layout = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id = chunk[:4]
+            chunk_size = struct.unpack(chunk_order + 'I', chunk[4:])[0]
+            chunk_start = f.tell()
+            
+            if chunk_id == b'fmt ':
+                fmt = f.read(min(chunk_size, 40))
+                tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if tag == WAVE_EXTENSIBLE and len(fmt) >= 26:
+                    tag = struct.unpack('<H', fmt[24:26])[0]
+                if tag not in (WAVE_PCM, WAVE_FLOAT) or not channels:
+                    return None
+                layout = {
+                    'channels': channels,
+                    'sample_rate': sample_rate,
+                    'width': block_align // channels,
+                    'float': tag == WAVE_FLOAT,
+                    'signed': bits > 8,
+                    'big_endian': False
+                }
+            elif chunk_id == b'COMM':
+                comm = f.read(chunk_size)
+                channels, _, bits = struct.unpack('>hIh', comm[:8])
+                compression = comm[18:22] if header[8:12] == b'AIFC' else b'NONE'
+                if compression not in (b'NONE', b'sowt', b'fl32', b'FL32') or channels <= 0:
+                    return None
+                is_float = compression in (b'fl32', b'FL32')
+                layout = {
+                    'channels': channels,
+                    'sample_rate': parse_extended_float(comm[8:18]),
+                    'width': 4 if is_float else (bits + 7) // 8,
+                    'float': is_float,
+                    'signed': True,
+                    'big_endian': compression != b'sowt'
+                }
+            elif chunk_id in (b'data', b'SSND'):
+                if layout is None:
+                    return None
+                offset = chunk_start
+                if chunk_id == b'SSND':
+                    offset += 8 + struct.unpack('>I', f.read(4))[0]
+                    chunk_size -= 8
+                # 流式写出的文件可能没有回填数据长度
+                length = max(0, min(chunk_size, file_size - offset))
+                frame_bytes = layout['width'] * layout['channels']
+                layout['offset'] = offset
+                layout['length'] = length - length % frame_bytes
+                if layout['float'] and layout['width'] not in (4, 8):
+                    return None
+                if not layout['float'] and layout['width'] not in (1, 2, 3, 4):
+                    return None
+                return layout
+            
+            f.seek(chunk_start + chunk_size + (chunk_size & 1))
+
+
+def pcm_to_int16(raw, layout):
+    """把一段原始采样字节向量化地转换为小端16位整数，规则与FFmpeg一致"""
+    width = layout['width']
+    order = '>' if layout['big_endian'] else '<'
+    if layout['float']:
+        samples = raw.view(f"{order}f{width}")
+        return np.clip(np.rint(samples * 32768.0), -32768, 32767).astype('<i2')
+    if width == 1:
+        if layout['signed']:
+            return raw.view(np.int8).astype('<i2') << 8
+        return (raw.astype('<i2') - 128) << 8
+    if width == 2:
+        return raw.view(f"{order}i2").astype('<i2')
+    if width == 3:
+        # 取每个24位采样的高16位（与FFmpeg的截断一致）
+        triples = raw.reshape(-1, 3)
+        high = triples[:, 0:2] if layout['big_endian'] else triples[:, 1:3]
+        return np.ascontiguousarray(high).view(f"{order}i2").astype('<i2').ravel()
+    return (raw.view(f"{order}i4") >> 16).astype('<i2')
+
+
+def convert_pcm_fast(input_file, output_file):
+    """在进程内把WAV/AIFF转换为16位WAV（采样率和声道数不变）
+    
+    输入通过mmap映射后分块做向量化转换，按大块写出。需要NumPy。
+    成功时返回与 probe_audio 相同结构的音频信息（时长由帧数和采样率算出），
+    源格式不受支持时返回None，由调用方回退到FFmpeg。
+    """
+    if np is None or Path(input_file).suffix.lower() not in FAST_PATH_EXTENSIONS:
+        return None
+    # 输出覆盖输入时打开输出会先截断源文件，交给FFmpeg报错
+    if Path(input_file).resolve() == Path(output_file).resolve():
+        return None
+    try:
+        layout = read_pcm_layout(input_file)
+    except (OSError, struct.error):
+        return None
+    # 多声道WAV需要WAVE_FORMAT_EXTENSIBLE声道掩码，交给FFmpeg
+    if layout is None or layout['channels'] > 2 or not layout['sample_rate']:
+        return None
+    frame_bytes = layout['width'] * layout['channels']
+    frames = layout['length'] // frame_bytes
+    if frames * layout['channels'] * 2 > 0xFFFFFFFF - 36:
+        return None
+    info = {
+        'sample_rate': layout['sample_rate'],
+        'channels': layout['channels'],
+        'duration': frames / layout['sample_rate'],
+        'samples': frames
+    }
+    
+    try:
+        with open(input_file, 'rb') as f, wave.open(str(output_file), 'wb') as out:
+            out.setnchannels(layout['channels'])
+            out.setsampwidth(2)
+            out.setframerate(layout['sample_rate'])
+            if frames == 0:
+                return info
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                data = np.frombuffer(mapped, dtype=np.uint8,
+                                     count=frames * frame_bytes, offset=layout['offset'])
+                try:
+                    step = FAST_PATH_CHUNK_FRAMES * frame_bytes
+                    for start in range(0, len(data), step):
+                        out.writeframesraw(pcm_to_int16(data[start:start + step], layout).tobytes())
+                finally:
+                    # mmap关闭前必须释放所有引用它的数组
+                    del data
+    except (OSError, ValueError, struct.error, wave.Error):
+        Path(output_file).unlink(missing_ok=True)
+        return None
+    return info
+
+# ========== 长文件分段并行编码 ==========
+
+# 支持分段并行编码的目标格式（WAV编码几乎没有计算量，分段只会多一次拷贝）
+SEGMENTED_FORMATS = {'FLAC', 'MP3'}
+
+# 短于该时长（秒）的文件不值得分段
+SEGMENT_MIN_DURATION = 600
+
+# 段起点前粗定位的余量（秒），精确裁剪交给atrim
+SEGMENT_SEEK_MARGIN = 1.0
+
+# FLAC分段使用固定块大小，段边界对齐到块，保证除最后一帧外都是完整帧
+FLAC_BLOCK_SIZE = 4096
+
+# libmp3lame 的总延迟（编码器576 + 解码器529）
+MP3_ENCODER_DELAY = 1105
+MP3_DECODER_DELAY = 529
+
+MP3_BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+}
+MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000]
+}
+
+
+def mp3_sample_rate_supported(sample_rate):
+    """MP3能否按源采样率直接编码（否则libmp3lame会重采样）"""
+    return any(sample_rate in rates for rates in MP3_SAMPLE_RATES.values())
+
+
+def mp3_frame_samples(sample_rate):
+    """Layer III每帧采样数：MPEG-1为1152，MPEG-2/2.5为576"""
+    return 1152 if sample_rate >= 32000 else 576
+
+
+def segment_boundaries(total_samples, segments, align):
+    """把采样区间均分为若干段，边界对齐到align的整数倍"""
+    bounds = [0]
+    for k in range(1, segments):
+        bound = round(total_samples * k / segments / align) * align
+        if bounds[-1] < bound < total_samples:
+            bounds.append(bound)
+    bounds.append(total_samples)
+    return bounds
+
+
+def iter_mp3_frames(stream):
+    """逐帧读取Layer III码流，跳过开头的ID3v2标签"""
+    header = stream.read(4)
+    if header[:3] == b'ID3':
+        rest = stream.read(6)
+        size = 0
+        for byte in rest[2:6]:
+            size = (size << 7) | (byte & 0x7F)
+        stream.read(size)
+        header = stream.read(4)
+    
+    while len(header) == 4 and header[:3] != b'TAG':
+        if header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+            raise ValueError("MP3帧同步失败")
+        version = (header[1] >> 3) & 0x03
+        layer = (header[1] >> 1) & 0x03
+        bitrate_index = header[2] >> 4
+        rate_index = (header[2] >> 2) & 0x03
+        padding = (header[2] >> 1) & 0x01
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            raise ValueError("不支持的MP3帧头")
+        
+        bitrate = MP3_BITRATES[version == 3][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        length = (144 if version == 3 else 72) * bitrate // sample_rate + padding
+        yield header + stream.read(length - 4)
+        header = stream.read(4)
+
+
+def lame_crc16(data):
+    """LAME信息标签使用的CRC-16（反射多项式0xA001，初值0）"""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def build_mp3_info_frame(first_frame, frame_count, audio_bytes, toc, padding, vbr):
+    """生成LAME/Xing信息帧：帧数、字节数、TOC、编码延迟与末尾填充
+    
+    与libmp3lame自身写出的信息帧格式相同，解码器据此去掉开头延迟和
+    末尾填充，实现无缝播放；audio_bytes为0时只用于计算帧长。
+    """
+    b1, b2, b3 = first_frame[1], first_frame[2], first_frame[3]
+    version = (b1 >> 3) & 0x03
+    mpeg1 = version == 3
+    sample_rate = MP3_SAMPLE_RATES[version][(b2 >> 2) & 0x03]
+    mono = (b3 >> 6) == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    tag_offset = 4 + side_info
+    needed = tag_offset + 120 + 36
+    
+    def frame_length(index):
+        return (144 if mpeg1 else 72) * MP3_BITRATES[mpeg1][index] * 1000 // sample_rate
+    
+    # 优先沿用音频帧的码率（CBR文件依赖首帧判断码率），放不下标签时取能放下的最小码率
+    bitrate_index = b2 >> 4
+    if frame_length(bitrate_index) < needed:
+        bitrate_index = next(i for i in range(1, 15) if frame_length(i) >= needed)
+    length = frame_length(bitrate_index)
+    
+    frame = bytearray(length)
+    frame[0] = 0xFF
+    frame[1] = b1 | 0x01  # 无CRC
+    frame[2] = (bitrate_index << 4) | (b2 & 0x0C)
+    frame[3] = b3
+    
+    total_bytes = length + audio_bytes
+    xing = tag_offset
+    frame[xing:xing + 4] = b'Xing' if vbr else b'Info'
+    frame[xing + 4:xing + 8] = (0x0F).to_bytes(4, 'big')  # 帧数 | 字节数 | TOC | 质量
+    frame[xing + 8:xing + 12] = frame_count.to_bytes(4, 'big')
+    frame[xing + 12:xing + 16] = total_bytes.to_bytes(4, 'big')
+    frame[xing + 16:xing + 116] = bytes(toc)
+    
+    lame = xing + 120
+    frame[lame:lame + 9] = b'LAME3.100'
+    frame[lame + 9] = 4 if vbr else 1  # VBR方法：4=VBR(mtrh)，1=CBR
+    if not vbr:
+        frame[lame + 20] = min(255, MP3_BITRATES[mpeg1][first_frame[2] >> 4])
+    delay = MP3_ENCODER_DELAY - MP3_DECODER_DELAY
+    frame[lame + 21:lame + 24] = ((delay << 12) | padding).to_bytes(3, 'big')
+    frame[lame + 28:lame + 32] = total_bytes.to_bytes(4, 'big')
+    frame[lame + 34:lame + 36] = lame_crc16(frame[:lame + 34]).to_bytes(2, 'big')
+    return bytes(frame)
+
+
+def flac_crc8(data):
+    """FLAC帧头CRC-8（多项式0x07，初值0）"""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def flac_crc16(data):
+    """FLAC帧CRC-16（多项式0x8005，初值0，不反射）"""
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+def gf2_mulmod(a, b):
+    """GF(2)上的多项式乘法，模 x^16 + x^15 + x^2 + 1"""
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        b >>= 1
+        a <<= 1
+        if a & 0x10000:
+            a ^= 0x18005
+    return result
+
+
+FLAC_CRC16_SHIFT_TABLES = []
+
+
+def flac_crc16_shift(crc, length):
+    """返回CRC状态crc再经过length个零字节后的值，即 crc·x^(8·length) mod P
+    
+    CRC在GF(2)上是线性的，只改帧头时据此更新整帧CRC-16，无需重新扫描帧数据。
+    """
+    if not FLAC_CRC16_SHIFT_TABLES:
+        # 第k张表对应乘以 x^(8·2^k)，按高低字节查表
+        power = 0x100
+        for _ in range(32):
+            FLAC_CRC16_SHIFT_TABLES.append((
+                [gf2_mulmod(v << 8, power) for v in range(256)],
+                [gf2_mulmod(v, power) for v in range(256)]
+            ))
+            power = gf2_mulmod(power, power)
+    
+    k = 0
+    while length:
+        if length & 1:
+            high, low = FLAC_CRC16_SHIFT_TABLES[k]
+            crc = high[crc >> 8] ^ low[crc & 0xFF]
+        length >>= 1
+        k += 1
+    return crc
+
+
+def flac_utf8(value):
+    """FLAC帧头中帧号使用的扩展UTF-8编码"""
+    if value < 0x80:
+        return bytes([value])
+    length = 2
+    while value >= 1 << (5 * length + 1):
+        length += 1
+    tail = []
+    for _ in range(length - 1):
+        tail.append(0x80 | (value & 0x3F))
+        value >>= 6
+    return bytes([((0xFF00 >> length) & 0xFF) | value] + tail[::-1])
+
+
+def parse_flac_frame_header(buf, pos, end):
+    """解析固定块大小的FLAC帧头，返回 (帧号, 帧头长度, 帧号字节数)；无效时返回None"""
+    if end - pos < 6 or buf[pos] != 0xFF or buf[pos + 1] != 0xF8:
+        return None
+    block_code, rate_code = buf[pos + 2] >> 4, buf[pos + 2] & 0x0F
+    channel_code, size_code = buf[pos + 3] >> 4, (buf[pos + 3] >> 1) & 0x07
+    if block_code == 0 or rate_code == 0x0F or channel_code > 10 or size_code == 3 or buf[pos + 3] & 0x01:
+        return None
+    
+    first = buf[pos + 4]
+    if first < 0x80:
+        utf_len, number = 1, first
+    elif 0xC0 <= first < 0xFF:
+        utf_len = 8 - (~first & 0xFF).bit_length()
+        number = first & (0xFF >> (utf_len + 1))
+        for i in range(1, utf_len):
+            if pos + 4 + i >= end or buf[pos + 4 + i] & 0xC0 != 0x80:
+                return None
+            number = (number << 6) | (buf[pos + 4 + i] & 0x3F)
+    else:
+        return None
+    
+    size = 4 + utf_len
+    size += {6: 1, 7: 2}.get(block_code, 0)
+    size += {12: 1, 13: 2, 14: 2}.get(rate_code, 0)
+    if pos + size >= end or flac_crc8(buf[pos:pos + size]) != buf[pos + size]:
+        return None
+    return number, size + 1, utf_len
+
+
+def iter_flac_frames(buf, start, end):
+    """按帧号连续定位FLAC帧，产出 (起点, 终点, 帧头信息)
+    
+    帧数据里可能出现同步码，因此下一帧必须同时满足帧头CRC-8正确且帧号连续。
+    """
+    header = parse_flac_frame_header(buf, start, end)
+    if header is None or header[0] != 0:
+        raise ValueError("FLAC分段不是从第0帧开始的固定块大小码流")
+    pos = start
+    while header is not None:
+        search = pos + header[1]
+        while True:
+            candidate = buf.find(b'\xff\xf8', search, end)
+            if candidate < 0:
+                next_pos, next_header = end, None
+                break
+            next_header = parse_flac_frame_header(buf, candidate, end)
+            if next_header is not None and next_header[0] == header[0] + 1:
+                next_pos = candidate
+                break
+            search = candidate + 1
+        yield pos, next_pos, header
+        pos, header = next_pos, next_header
+
+
+def flac_audio_offset(stream):
+    """跳过FLAC元数据块，返回首个音频帧的偏移"""
+    if stream.read(4) != b'fLaC':
+        raise ValueError("不是有效的FLAC文件")
+    while True:
+        block_header = stream.read(4)
+        if len(block_header) < 4:
+            raise ValueError("FLAC元数据不完整")
+        stream.seek(int.from_bytes(block_header[1:4], 'big'), os.SEEK_CUR)
+        if block_header[0] & 0x80:
+            return stream.tell()
+
+
+def patch_flac_streaminfo(path, total_samples, min_frame, max_frame):
+    """拼接后改写STREAMINFO：总采样数和帧大小范围设为实际值，MD5标记为未知"""
+    with open(path, 'r+b') as f:
+        header = f.read(5)
+        if header[:4] != b'fLaC' or header[4] & 0x7F != 0:
+            raise ValueError("FLAC首个元数据块不是STREAMINFO")
+        f.seek(8)
+        info = bytearray(f.read(34))
+        info[4:7] = min_frame.to_bytes(3, 'big')
+        info[7:10] = max_frame.to_bytes(3, 'big')
+        info[13] = (info[13] & 0xF0) | ((total_samples >> 32) & 0x0F)
+        info[14:18] = (total_samples & 0xFFFFFFFF).to_bytes(4, 'big')
+        info[18:34] = bytes(16)
+        f.seek(8)
+        f.write(info)
+
+
+def join_flac_segments(segments, bounds, output_path, total):
+    """拼接FLAC分段：帧号改写为全局连续编号，并更新帧头CRC-8与整帧CRC-16"""
+    min_frame, max_frame = None, 0
+    with open(output_path, 'wb') as out:
+        for index, (segment_file, _) in enumerate(segments):
+            first_number = bounds[index] // FLAC_BLOCK_SIZE
+            expected = -(-(bounds[index + 1] - bounds[index]) // FLAC_BLOCK_SIZE)
+            count = 0
+            with open(segment_file, 'rb') as f:
+                audio_start = flac_audio_offset(f)
+                if index == 0:
+                    f.seek(0)
+                    out.write(f.read(audio_start))
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for start, end, (number, header_size, utf_len) in iter_flac_frames(mapped, audio_start, len(mapped)):
+                        if first_number:
+                            old_header = mapped[start:start + header_size]
+                            header = (old_header[:4] + flac_utf8(first_number + number)
+                                      + old_header[4 + utf_len:header_size - 1])
+                            header += bytes([flac_crc8(header)])
+                            old_crc = int.from_bytes(mapped[end - 2:end], 'big')
+                            crc = old_crc ^ flac_crc16_shift(
+                                flac_crc16(old_header) ^ flac_crc16(header),
+                                end - start - header_size - 2)
+                            out.write(header)
+                            out.write(mapped[start + header_size:end - 2])
+                            out.write(crc.to_bytes(2, 'big'))
+                            size = end - start - header_size + len(header)
+                        else:
+                            out.write(mapped[start:end])
+                            size = end - start
+                        min_frame = size if min_frame is None else min(min_frame, size)
+                        max_frame = max(max_frame, size)
+                        count += 1
+            if count != expected:
+                raise RuntimeError(f"第{index + 1}段FLAC帧数不符: 期望 {expected}, 实际 {count}")
+    patch_flac_streaminfo(output_path, total, min_frame or 0, max_frame)
+
+
+def join_mp3_segments(segments, bounds, output_path, total, align, vbr):
+    """拼接MP3分段：只保留全局帧网格上的帧，并在最前面写入LAME/Xing信息帧"""
+    frame_sizes = array.array('L')
+    info_length = 0
+    last = len(segments) - 1
+    with open(output_path, 'wb') as out:
+        first_frame = None
+        for index, (segment_file, trim_start) in enumerate(segments):
+            # 段内第j帧对应全局帧 trim_start/align + j
+            first = (bounds[index] - trim_start) // align
+            stop = None if index == last else (bounds[index + 1] - trim_start) // align
+            written = 0
+            with open(segment_file, 'rb') as f:
+                for j, frame in enumerate(iter_mp3_frames(f)):
+                    if stop is not None and j >= stop:
+                        break
+                    if j < first:
+                        continue
+                    if first_frame is None:
+                        # 先为信息帧留出位置，帧数等信息最后回填
+                        first_frame = frame
+                        info_length = len(build_mp3_info_frame(frame, 0, 0, bytes(100), 0, vbr))
+                        out.write(bytes(info_length))
+                    out.write(frame)
+                    frame_sizes.append(len(frame))
+                    written += 1
+            if stop is not None and written != stop - first:
+                raise RuntimeError(f"第{index + 1}段MP3帧数不足")
+        
+        frame_count = len(frame_sizes)
+        padding = frame_count * align - total - (MP3_ENCODER_DELAY - MP3_DECODER_DELAY)
+        if first_frame is None or not MP3_DECODER_DELAY <= padding < 4096:
+            raise RuntimeError("MP3帧数与源采样数不匹配")
+        
+        # TOC：第i个百分点所在帧的字节位置（相对整个文件）占总长度的比例×256
+        audio_bytes = sum(frame_sizes)
+        total_bytes = info_length + audio_bytes
+        offsets = list(itertools.accumulate(frame_sizes, initial=info_length))
+        toc = [min(255, offsets[frame_count * i // 100] * 256 // total_bytes) for i in range(100)]
+        out.seek(0)
+        out.write(build_mp3_info_frame(first_frame, frame_count, audio_bytes, toc, padding, vbr))
+
+
+def encode_segmented(input_file, output_file, target_format, quality, info, workers, timeout=300):
+    """把长文件按采样边界切段并行编码，再无缝拼接并校验采样数
+    
+    每段先在输入端粗定位到段起点附近，再用atrim按采样精确裁剪，因此各段
+    只解码自己的那部分。FLAC段边界对齐到固定块，拼接时把帧号改写为全局
+    连续编号；MP3按帧对齐切段，每段带前后重叠并关闭比特池，拼接时只保留
+    各段在全局帧网格上对应的帧，并写入记录编码延迟与填充的信息帧，
+    因此与整文件一次编码一样可以无缝解码出与源完全相同的采样数。
+    """
+    sample_rate = info['sample_rate']
+    if target_format == 'MP3' and not mp3_sample_rate_supported(sample_rate):
+        raise ValueError(f"MP3不支持 {sample_rate} Hz，无法按源采样分段")
+    total = info['samples'] if info['samples'] is not None else count_decoded_samples(input_file)
+    
+    if target_format == 'MP3':
+        align = mp3_frame_samples(sample_rate)
+        pre_roll = (-(-MP3_ENCODER_DELAY // align) + 2) * align
+        post_roll = 2 * align
+    else:
+        align, pre_roll, post_roll = FLAC_BLOCK_SIZE, 0, 0
+    
+    bounds = segment_boundaries(total, workers, align)
+    output_path = Path(output_file)
+    temp_dir = Path(tempfile.mkdtemp(prefix='.segments_', dir=output_path.parent))
+    
+    def encode(index):
+        start, end = bounds[index], bounds[index + 1]
+        trim_start = max(0, start - pre_roll)
+        trim_end = min(total, end + post_roll)
+        segment_file = temp_dir / f"{index:04d}.seg"
+        
+        # 输入端粗定位并保留原始时间戳（音频滤镜时间基为1/采样率），
+        # atrim 再按采样编号精确裁剪
+        cmd = ['ffmpeg', '-hide_banner', '-nostdin', '-y']
+        seek = trim_start / sample_rate - SEGMENT_SEEK_MARGIN
+        if seek > 0:
+            cmd.extend(['-ss', f"{seek:.6f}", '-noaccurate_seek'])
+        cmd.extend(['-copyts', '-i', str(input_file), '-vn',
+                    '-af', f"atrim=start_pts={trim_start}:end_pts={trim_end},asetpts=PTS-STARTPTS"])
+        cmd.extend(codec_arguments(target_format, quality))
+        if target_format == 'MP3':
+            cmd.extend(['-reservoir', '0', '-write_xing', '0', '-id3v2_version', '0', '-f', 'mp3'])
+        else:
+            cmd.extend(['-frame_size', str(FLAC_BLOCK_SIZE), '-f', 'flac'])
+        cmd.append(str(segment_file))
+        
+        process = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if process.returncode != 0:
+            raise RuntimeError(f"第{index + 1}段编码失败: {process.stderr[:100]}")
+        return segment_file, trim_start
+    
+    try:
+        with ThreadPoolExecutor(max_workers=len(bounds) - 1) as pool:
+            segments = list(pool.map(encode, range(len(bounds) - 1)))
+        
+        if target_format == 'FLAC':
+            join_flac_segments(segments, bounds, output_path, total)
+        else:
+            join_mp3_segments(segments, bounds, output_path, total, align, vbr=quality == '无损')
+        
+        # 校验：采样率一致，无缝解码后的采样数与源完全相同
+        decoded = count_decoded_samples(output_path)
+        if probe_audio(output_path)['sample_rate'] != sample_rate:
+            raise RuntimeError("分段输出采样率与源文件不一致")
+        if decoded != total:
+            raise RuntimeError(f"分段输出采样数校验失败: 源 {total}, 输出 {decoded}")
+    except Exception:
+        output_path.unlink(missing_ok=True)
+        raise
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
 class BatchAudioConverterApp:
     def __init__(self, root):
@@ -16,17 +1400,7 @@ class BatchAudioConverterApp:
         self.root.resizable(True, True)
         
         # 支持的格式
-        self.supported_formats = {
-            'FLAC': '.flac',
-            'MP3': '.mp3',
-            'WAV': '.wav',
-            'OGG': '.ogg',
-            'AAC': '.aac',
-            'M4A': '.m4a',
-            'WMA': '.wma',
-            'AIFF': '.aiff',
-            'ALAC': '.m4a'
-        }
+        self.supported_formats = SUPPORTED_FORMATS
         
         # 转换队列
         self.conversion_queue = []
@@ -34,8 +1408,18 @@ class BatchAudioConverterApp:
         self.is_converting = False
         self.conversion_stats = {"success": 0, "failed": 0, "total": 0}
         
+        # 吞吐模型（用于预估和实时剩余时间）
+        self.throughput_model = ThroughputModel()
+        self.batch_started = None
+        self.completed_audio = 0.0
+        self.last_eta_update = 0.0
+        
         # 线程池
         self.executor = None
+        self.limiter = None
+        self.autotuner = None
+        self.archive_readers = {}
+        self.zip_archives = {}
         self.progress_queue = queue.Queue()
         
         # 设置主题
@@ -111,6 +1495,13 @@ class BatchAudioConverterApp:
                                width=20)
         folder_btn.pack(fill=tk.X, pady=(0, 5))
         
+        # 压缩包导入（不解压）
+        archive_btn = ttk.Button(batch_frame,
+                                text="📦 导入压缩包",
+                                command=self.import_archive,
+                                width=20)
+        archive_btn.pack(fill=tk.X, pady=(0, 5))
+        
         # 多文件选择
         files_btn = ttk.Button(batch_frame,
                               text="📄 选择多个文件",
@@ -144,11 +1535,30 @@ class BatchAudioConverterApp:
         self.quality_var = tk.StringVar(value='320k')
         quality_combo = ttk.Combobox(settings_frame,
                                     textvariable=self.quality_var,
-                                    values=['64k', '128k', '192k', '256k', '320k', '无损'],
+                                    values=QUALITY_OPTIONS,
                                     state='readonly',
                                     width=18)
         quality_combo.pack(fill=tk.X, pady=(0, 10))
         
+        # 单个长文件分段并行编码
+        self.segment_parallel_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame,
+                        text="长文件分段并行编码",
+                        variable=self.segment_parallel_var).pack(anchor=tk.W, pady=(0, 10))
+        
+        # 批量转换时自动调节并发数
+        self.autotune_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame,
+                        text="自动调节并发数",
+                        variable=self.autotune_var).pack(anchor=tk.W, pady=(0, 10))
+        
+        # PCM→WAV 进程内快速通道（需要NumPy）
+        self.fast_pcm_var = tk.BooleanVar(value=np is not None)
+        ttk.Checkbutton(settings_frame,
+                        text="PCM→WAV 快速通道 (NumPy)",
+                        variable=self.fast_pcm_var,
+                        state='normal' if np is not None else 'disabled').pack(anchor=tk.W, pady=(0, 10))
+        
         # 输出目录
         ttk.Label(settings_frame, text="输出目录:", font=('Arial', 10, 'bold')).pack(anchor=tk.W, pady=(0, 5))
         
@@ -185,6 +1595,12 @@ class BatchAudioConverterApp:
                                      style='Accent.TButton')
         self.convert_btn.pack(fill=tk.X, pady=(0, 5))
         
+        # 预估按钮（只探测、不转换）
+        self.plan_btn = ttk.Button(control_frame,
+                                  text="📐 预估耗时与空间",
+                                  command=self.plan_conversion)
+        self.plan_btn.pack(fill=tk.X, pady=(0, 5))
+        
         # 暂停/继续按钮
         self.pause_btn = ttk.Button(control_frame,
                                    text="⏸️ 暂停",
@@ -295,7 +1711,8 @@ class BatchAudioConverterApp:
             'total': tk.StringVar(value="总计: 0"),
             'success': tk.StringVar(value="成功: 0"),
             'failed': tk.StringVar(value="失败: 0"),
-            'remaining': tk.StringVar(value="剩余: 0")
+            'remaining': tk.StringVar(value="剩余: 0"),
+            'eta': tk.StringVar(value="预计剩余: --")
         }
         
         for key, var in self.stats_vars.items():
@@ -312,11 +1729,8 @@ class BatchAudioConverterApp:
         if not folder_path:
             return
         
-        # 支持的音频扩展名
-        audio_extensions = {'.flac', '.mp3', '.wav', '.ogg', '.aac', '.m4a', '.wma', '.aiff'}
-        
         files = []
-        for ext in audio_extensions:
+        for ext in AUDIO_EXTENSIONS:
             files.extend(Path(folder_path).glob(f"*{ext}"))
             files.extend(Path(folder_path).glob(f"*{ext.upper()}"))
         
@@ -327,6 +1741,53 @@ class BatchAudioConverterApp:
         self.add_files_to_list(files)
         self.show_info("导入成功", f"成功导入 {len(files)} 个音频文件")
     
+    def import_archive(self):
+        """导入zip/tar压缩包中的音频（转换时直接流式读取，不解压）"""
+        archive_path = filedialog.askopenfilename(
+            title="选择音频压缩包",
+            filetypes=[
+                ("压缩包", "*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tbz2 *.tar.xz *.txz"),
+                ("所有文件", "*.*")
+            ]
+        )
+        if not archive_path:
+            return
+        
+        archive_path = Path(archive_path)
+        try:
+            members = list_archive_audio(archive_path)
+        except (zipfile.BadZipFile, tarfile.TarError, OSError) as e:
+            self.show_error("导入失败", f"无法读取压缩包: {e}")
+            return
+        
+        if not members:
+            self.show_info("导入结果", "压缩包中未找到支持的音频文件")
+            return
+        
+        existing = {item['path'] for item in self.conversion_queue}
+        added = 0
+        for member, size, offset in members:
+            member_path = archive_path / member
+            if member_path in existing:
+                continue
+            self.conversion_queue.append({
+                'path': member_path,
+                'name': Path(member).name,
+                'ext': Path(member).suffix.upper(),
+                'size': f"{size / (1024 * 1024):.2f} MB",
+                'status': '等待',
+                'tree_id': None,
+                'archive': archive_path,
+                'member': member,
+                'member_size': size,
+                'offset': offset
+            })
+            added += 1
+        
+        self.update_file_list()
+        self.update_file_count()
+        self.show_info("导入成功", f"从 {archive_path.name} 导入 {added} 个音频文件")
+    
     def select_multiple_files(self):
         """选择多个文件"""
         filetypes = [
@@ -482,8 +1943,11 @@ class BatchAudioConverterApp:
         self.reset_stats()
         
         # 创建线程池（单个文件也使用线程池，但可以设置最大工作线程为1）
-        max_workers = 1 if len(self.conversion_queue) == 1 else 2
+        self.setup_autotuner()
+        max_workers = self.autotuner.max_workers if self.autotuner else self.batch_worker_count()
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.batch_started = time.time()
+        self.completed_audio = 0.0
         self.is_converting = True
         self.pause_conversion = False
         
@@ -505,6 +1969,163 @@ class BatchAudioConverterApp:
         
         self.update_control_buttons()
     
+    def batch_worker_count(self):
+        """批量转换使用的工作线程数"""
+        return 1 if len(self.conversion_queue) == 1 else 2
+    
+    def setup_autotuner(self):
+        """按需创建并发闸门和自动调节器（单个文件时不启用）"""
+        self.limiter = None
+        self.autotuner = None
+        waiting = [item for item in self.conversion_queue if item['status'] == '等待']
+        if not self.autotune_var.get() or len(waiting) < 2:
+            return
+        
+        # 配置：目标格式、质量和批次中最多的源格式
+        extensions = [item['ext'] for item in waiting]
+        source_ext = max(set(extensions), key=extensions.count)
+        profile = f"{self.format_var.get()}|{self.quality_var.get()}|{source_ext}"
+        
+        def on_change(old, new, throughput):
+            self.log(f"自动调节: 并发数 {old} → {new}（吞吐 {throughput:.1f} 音频秒/秒）")
+        
+        self.limiter = ConcurrencyLimiter(self.batch_worker_count())
+        self.autotuner = ConcurrencyAutotuner(self.limiter, profile,
+                                              max_workers=min(16, (os.cpu_count() or 1) * 2),
+                                              initial=self.batch_worker_count(),
+                                              on_change=on_change)
+        self.log(f"自动调节并发数已启用，起始并发数 {self.limiter.limit}")
+    
+    def probe_items(self, items):
+        """并行探测文件时长，结果保存在 item['info']（压缩包成员无法预先探测）"""
+        def probe(item):
+            if 'info' in item or item.get('archive'):
+                return
+            try:
+                item['info'] = probe_audio(item['path'])
+            except (RuntimeError, OSError, ValueError, KeyError, subprocess.TimeoutExpired):
+                item['info'] = None
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(probe, items))
+    
+    def plan_conversion(self):
+        """预估转换耗时和输出空间（不实际转换）"""
+        items = [item for item in self.conversion_queue if item['status'] == '等待']
+        if not items:
+            self.show_info("预估", "没有等待转换的文件")
+            return
+        
+        self.plan_btn.config(state='disabled')
+        self.log(f"正在探测 {len(items)} 个文件的时长...")
+        thread = threading.Thread(target=self.run_plan, args=(items,), daemon=True)
+        thread.start()
+    
+    def run_plan(self, items):
+        """探测时长并根据吞吐模型生成计划"""
+        try:
+            self.probe_items(items)
+        finally:
+            self.plan_btn.config(state='normal')
+        
+        infos = [item['info'] for item in items if item.get('info')]
+        if not infos:
+            self.show_warning("预估", "无法探测任何文件的时长")
+            return
+        
+        # 未知时长的文件按已知文件的平均时长计
+        average = sum(info['duration'] for info in infos) / len(infos)
+        durations = [item['info']['duration'] if item.get('info') else average for item in items]
+        total_audio = sum(durations)
+        unknown = len(items) - len(infos)
+        sample_rate = max(info['sample_rate'] for info in infos)
+        channels = max(info['channels'] for info in infos)
+        
+        target_format = self.format_var.get()
+        quality = self.quality_var.get()
+        speed = self.throughput_model.speed(target_format, quality)
+        
+        lines = [
+            f"转换计划: {target_format} {quality}",
+            f"文件数: {len(items)}" + (f"（{unknown} 个时长未知，按平均值估算）" if unknown else ""),
+            f"音频总时长: {format_seconds(total_audio)}",
+            "",
+            "预计耗时:"
+        ]
+        cores = os.cpu_count() or 1
+        for workers in sorted({1, self.batch_worker_count(), cores}):
+            marker = "  ← 当前设置" if workers == self.batch_worker_count() else ""
+            wall = estimate_wall_time(durations, speed, workers)
+            lines.append(f"  {workers:>2} 线程: {format_seconds(wall)}{marker}")
+        
+        lines.extend(["", "预计输出大小:"])
+        for fmt in self.supported_formats:
+            qualities = QUALITY_OPTIONS if fmt in QUALITY_SENSITIVE_FORMATS else [quality]
+            for q in qualities:
+                size = total_audio * self.throughput_model.bytes_per_second(fmt, q, sample_rate, channels)
+                label = f"{fmt} {q}" if fmt in QUALITY_SENSITIVE_FORMATS else fmt
+                marker = "  ← 当前设置" if (fmt, q) == (target_format, quality) else ""
+                lines.append(f"  {label:<12} {format_bytes(size):>12}{marker}")
+        
+        self.stats_text.delete(1.0, tk.END)
+        self.stats_text.insert(1.0, "\n".join(lines))
+        current = estimate_wall_time(durations, speed, self.batch_worker_count())
+        current_size = total_audio * self.throughput_model.bytes_per_second(
+            target_format, quality, sample_rate, channels)
+        self.log(f"预估完成: 约 {format_seconds(current)}，输出约 {format_bytes(current_size)}（详见统计信息）")
+    
+    def record_throughput(self, item, output_file, wall_seconds, stderr=''):
+        """把一次成功转换计入吞吐模型
+        
+        时长取自本批已有的信息（预估时的探测、快速通道读到的文件头）或FFmpeg
+        输出中的时长；都没有时不计入，不为此额外启动进程。
+        """
+        duration = item['info']['duration'] if item.get('info') else parse_ffmpeg_duration(stderr)
+        if not duration:
+            return
+        try:
+            output_bytes = Path(output_file).stat().st_size
+        except OSError:
+            return
+        self.completed_audio += duration
+        if self.autotuner:
+            self.autotuner.record(duration)
+        self.throughput_model.record(self.format_var.get(), self.quality_var.get(),
+                                     duration, wall_seconds, output_bytes)
+    
+    def estimate_remaining(self):
+        """实时剩余时间：有完成样本后用本批实测吞吐，否则用模型预测"""
+        if not self.is_converting or self.batch_started is None:
+            return None
+        remaining = [item for item in self.conversion_queue if item['status'] in ('等待', '转换中')]
+        if not remaining:
+            return 0.0
+        
+        known = [item['info']['duration'] for item in remaining if item.get('info')]
+        finished = self.conversion_stats['success']
+        if known:
+            average = sum(known) / len(known)
+        elif finished and self.completed_audio:
+            average = self.completed_audio / finished
+        else:
+            return None
+        remaining_audio = sum(known) + average * (len(remaining) - len(known))
+        
+        elapsed = time.time() - self.batch_started
+        if self.completed_audio > 0 and elapsed > 0:
+            rate = self.completed_audio / elapsed
+        else:
+            speed = self.throughput_model.speed(self.format_var.get(), self.quality_var.get())
+            workers = self.limiter.limit if self.limiter else self.batch_worker_count()
+            rate = speed * min(workers, os.cpu_count() or 1)
+        return remaining_audio / rate
+    
+    def update_eta_display(self):
+        """刷新预计剩余时间"""
+        eta = self.estimate_remaining()
+        self.stats_vars['eta'].set(f"预计剩余: {format_seconds(eta) if eta is not None else '--'}")
+        return eta
+    
     def run_batch_conversion(self):
         """运行批量转换"""
         # 获取等待转换的文件
@@ -519,6 +2140,28 @@ class BatchAudioConverterApp:
         self.conversion_stats['total'] = len(files_to_convert)
         self.update_stats_display()
         
+        # 压缩tar只能顺序读取：每个压缩包一个读取器，成员按包内顺序提交；
+        # zip每个压缩包只解析一次中央目录，所有成员共用同一个ZipFile
+        self.archive_readers = {}
+        self.zip_archives = {}
+        sequential = {}
+        zip_checked = {}
+        for item in files_to_convert:
+            archive = item.get('archive')
+            if not archive or item.get('offset') is not None:
+                continue
+            if archive not in zip_checked:
+                zip_checked[archive] = zipfile.is_zipfile(archive)
+                if zip_checked[archive]:
+                    try:
+                        self.zip_archives[archive] = zipfile.ZipFile(archive)
+                    except (zipfile.BadZipFile, OSError):
+                        pass
+            if not zip_checked[archive]:
+                sequential.setdefault(archive, []).append(item['member'])
+        for archive, members in sequential.items():
+            self.archive_readers[archive] = TarStreamReader(archive, members)
+        
         # 提交转换任务
         futures = []
         for item in files_to_convert:
@@ -544,6 +2187,39 @@ class BatchAudioConverterApp:
     
     def convert_single_file(self, item):
         """转换单个文件"""
+        # 压缩tar的成员由顺序读取器提供，先等数据到达再占用并发名额
+        reader = self.archive_readers.get(item.get('archive'))
+        stream = reader.take(item['member']) if reader else None
+        try:
+            if stream is not None:
+                stream.wait_ready()
+            
+            limiter = self.limiter
+            if limiter is None:
+                return self.convert_file(item, stream)
+            
+            # 自动调节模式下由闸门控制实际并发数
+            if not limiter.acquire():
+                return False
+            try:
+                return self.convert_file(item, stream)
+            finally:
+                limiter.release()
+        finally:
+            if stream is not None:
+                stream.close()
+    
+    def close_archive_readers(self):
+        """停止所有压缩包顺序读取器，关闭共用的zip"""
+        for reader in self.archive_readers.values():
+            reader.close()
+        self.archive_readers = {}
+        for zf in self.zip_archives.values():
+            zf.close()
+        self.zip_archives = {}
+    
+    def convert_file(self, item, stream=None):
+        """执行单个文件的转换"""
         try:
             # 更新状态
             item['status'] = '转换中'
@@ -552,22 +2228,66 @@ class BatchAudioConverterApp:
             # 构建输出路径
             output_dir = Path(self.output_dir_var.get())
             target_format = self.format_var.get()
-            output_filename = Path(item['path']).stem + self.supported_formats[target_format]
-            output_file = output_dir / output_filename
-            
-            # 构建FFmpeg命令
-            cmd = self.build_ffmpeg_command(str(item['path']), str(output_file))
+            if item.get('archive'):
+                output_file = archive_output_path(output_dir, item['member'],
+                                                  self.supported_formats[target_format])
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+            else:
+                output_filename = Path(item['path']).stem + self.supported_formats[target_format]
+                output_file = output_dir / output_filename
             
             # 运行转换
             self.current_file_var.set(item['name'])
             self.current_progress_var.set(0)
+            segmented = None if item.get('archive') else self.convert_segmented(item, output_file)
+            # 分段编码失败回退时，只对普通转换计时
+            started = time.time()
+            fast_info = None
+            if (segmented is None and not item.get('archive') and self.fast_pcm_var.get()
+                    and target_format == 'WAV'):
+                fast_info = convert_pcm_fast(item['path'], output_file)
             
-            process = subprocess.run(cmd, 
-                                   capture_output=True, 
-                                   text=True, 
-                                   timeout=300)  # 5分钟超时
+            if segmented is not None:
+                returncode, stderr = segmented
+            elif fast_info is not None:
+                # PCM→PCM 在进程内完成，无需启动FFmpeg；时长直接取自源文件头
+                item['info'] = fast_info
+                returncode, stderr = 0, ''
+            elif item.get('archive') and item.get('offset') is None:
+                # zip和压缩tar的成员直接流式写入FFmpeg标准输入
+                cmd = self.build_ffmpeg_command('pipe:0', str(output_file))
+                if stream is not None:
+                    returncode, stderr = run_ffmpeg_piped(cmd, stream, timeout=300)
+                    if stream.closed.is_set():
+                        # 批次被停止，输入在中途被截断
+                        returncode, stderr = 1, "转换已停止"
+                else:
+                    # ZipFile.open 可在多个线程中同时调用
+                    zf = self.zip_archives.get(item['archive'])
+                    with (zf.open(item['member']) if zf else
+                          open_archive_member(item['archive'], item['member'])) as source:
+                        returncode, stderr = run_ffmpeg_piped(cmd, source, timeout=300)
+            else:
+                # 构建FFmpeg命令；未压缩tar的成员通过subfile协议读取，与普通文件一样可定位
+                if item.get('archive'):
+                    source = archive_member_url(item['archive'], item['offset'], item['member_size'])
+                else:
+                    source = str(item['path'])
+                cmd = self.build_ffmpeg_command(source, str(output_file))
+                process = subprocess.run(cmd, 
+                                       capture_output=True, 
+                                       text=True, 
+                                       timeout=300)  # 5分钟超时
+                returncode, stderr = process.returncode, process.stderr
+            
+            if returncode == 0 and segmented is None and fast_info is None and ffmpeg_output_empty(stderr):
+                returncode = 1
+                stderr = "没有编码出任何音频（MP4/M4A等格式无法从压缩包流式读取）"
             
-            if process.returncode == 0:
+            if returncode == 0:
+                # 分段编码占用多核，不计入单任务吞吐模型
+                if segmented is None:
+                    self.record_throughput(item, output_file, time.time() - started, stderr)
                 item['status'] = '✓ 成功'
                 self.log(f"成功: {item['name']} → {target_format}")
                 
@@ -581,7 +2301,7 @@ class BatchAudioConverterApp:
                 return True
             else:
                 item['status'] = '✗ 失败'
-                self.log(f"失败: {item['name']} - {process.stderr[:100]}")
+                self.log(f"失败: {item['name']} - {stderr[:100]}")
                 return False
                 
         except subprocess.TimeoutExpired:
@@ -597,33 +2317,37 @@ class BatchAudioConverterApp:
             self.current_progress_var.set(0)
             self.current_file_var.set("无")
     
-    def build_ffmpeg_command(self, input_file, output_file):
-        """构建FFmpeg命令"""
-        cmd = ['ffmpeg', '-i', input_file, '-y', '-hide_banner']
-        
+    def convert_segmented(self, item, output_file):
+        """单个长文件分段并行编码，不适用时返回None以走普通转换"""
         target_format = self.format_var.get()
-        quality = self.quality_var.get()
+        workers = os.cpu_count() or 1
+        if (not self.segment_parallel_var.get() or self.conversion_stats['total'] != 1
+                or target_format not in SEGMENTED_FORMATS or workers < 2):
+            return None
         
-        if target_format == 'MP3':
-            cmd.extend(['-codec:a', 'libmp3lame'])
-            if quality != '无损':
-                cmd.extend(['-b:a', quality])
-            else:
-                cmd.extend(['-q:a', '0'])
-        elif target_format == 'WAV':
-            cmd.extend(['-codec:a', 'pcm_s16le'])
-        elif target_format == 'FLAC':
-            cmd.extend(['-codec:a', 'flac'])
-            if quality != '无损':
-                cmd.extend(['-compression_level', '8'])
-        elif target_format == 'OGG':
-            cmd.extend(['-codec:a', 'libvorbis'])
-            if quality != '无损':
-                quality_map = {'64k': '2', '128k': '4', '192k': '6', '256k': '8', '320k': '10'}
-                cmd.extend(['-q:a', quality_map.get(quality, '6')])
-        
-        cmd.append(output_file)
-        return cmd
+        try:
+            info = probe_audio(item['path'])
+        except (RuntimeError, OSError, ValueError, KeyError, subprocess.TimeoutExpired):
+            return None
+        if info['duration'] < SEGMENT_MIN_DURATION:
+            return None
+        # 高采样率源会被libmp3lame重采样，段边界无法按源采样对齐到MP3帧
+        if target_format == 'MP3' and not mp3_sample_rate_supported(info['sample_rate']):
+            return None
+        
+        self.log(f"分段并行编码: {item['name']} ({workers} 段)")
+        try:
+            encode_segmented(item['path'], output_file, target_format,
+                             self.quality_var.get(), info, workers)
+        except (RuntimeError, ValueError, OSError, subprocess.TimeoutExpired) as e:
+            self.log(f"分段编码失败，改用普通转换: {item['name']} - {str(e)[:100]}")
+            return None
+        return 0, ''
+    
+    def build_ffmpeg_command(self, input_file, output_file):
+        """构建FFmpeg命令"""
+        return build_ffmpeg_command(input_file, output_file,
+                                    self.format_var.get(), self.quality_var.get())
     
     def update_item_status(self, item):
         """更新项目状态"""
@@ -662,6 +2386,9 @@ class BatchAudioConverterApp:
     
     def stop_conversion(self):
         """停止转换"""
+        if self.limiter:
+            self.limiter.close()
+        self.close_archive_readers()
         if self.executor:
             self.executor.shutdown(wait=False, cancel_futures=True)
         self.is_converting = False
@@ -671,6 +2398,15 @@ class BatchAudioConverterApp:
     def finish_conversion(self):
         """完成转换"""
         self.is_converting = False
+        self.close_archive_readers()
+        self.throughput_model.save()
+        if self.autotuner:
+            self.autotuner.save()
+            best = self.autotuner.best()
+            if best:
+                self.log(f"自动调节: 本配置最佳并发数 {best[0]}")
+            self.autotuner = None
+        self.update_eta_display()
         
         # 更新状态
         self.status_label.config(text="就绪")
@@ -717,6 +2453,8 @@ class BatchAudioConverterApp:
         self.stats_vars['success'].set(f"成功: {success}")
         self.stats_vars['failed'].set(f"失败: {failed}")
         self.stats_vars['remaining'].set(f"剩余: {remaining}")
+        eta = self.update_eta_display()
+        eta_text = format_seconds(eta) if eta is not None else '--'
         
         # 更新统计文本框
         stats_text = f"""
@@ -727,6 +2465,7 @@ class BatchAudioConverterApp:
 ║ 成功转换: {success:>20}  ║
 ║ 转换失败: {failed:>20}  ║
 ║ 等待转换: {remaining:>20}  ║
+║ 预计剩余: {eta_text:>20}  ║
 ║                                  ║
 ║ 成功率: {(success/total*100 if total>0 else 0):>22.1f}%  ║
 ╚══════════════════════════════════╝
@@ -745,6 +2484,11 @@ class BatchAudioConverterApp:
         except:
             pass
         
+        # 每秒刷新一次实时剩余时间
+        if self.is_converting and time.time() - self.last_eta_update >= 1:
+            self.last_eta_update = time.time()
+            self.update_eta_display()
+        
         self.root.after(100, self.check_progress_updates)
     
     def log(self, message):
@@ -772,11 +2516,442 @@ class BatchAudioConverterApp:
     
     def on_closing(self):
         """关闭窗口时的处理"""
+        if self.limiter:
+            self.limiter.close()
+        self.close_archive_readers()
         if self.executor:
             self.executor.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
 
+
+# ========== 常驻转换服务 ==========
+
+class ConversionService:
+    """常驻转换服务：保持一个共享的工作线程池，按优先级处理提交的任务"""
+    
+    FINAL_STATES = ('done', 'failed', 'cancelled')
+    
+    # 已结束的任务保留的秒数和最多保留的个数，超出后从内存中清除
+    FINISHED_RETENTION = 3600
+    MAX_FINISHED_JOBS = 1000
+    
+    def __init__(self, workers, output_dir, fast_pcm=False):
+        # 所有输出都限制在该目录之内，任务里的 output_dir 只能是它的子目录
+        self.output_dir = Path(output_dir).expanduser().resolve()
+        self.fast_pcm = fast_pcm
+        self.jobs = {}
+        self.pending = []  # 堆：(-优先级, 序号, 任务ID)
+        self.cancel_events = {}
+        self.probe_cache = {}
+        self.throughput_model = ThroughputModel()
+        self.counter = itertools.count(1)
+        self.condition = threading.Condition()
+        
+        self.threads = []
+        for _ in range(workers):
+            thread = threading.Thread(target=self.worker_loop, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+    
+    def submit(self, spec):
+        """提交任务，spec 包含 path、format、quality、priority、output_dir、member"""
+        for field in ('path', 'format', 'quality', 'member', 'output_dir'):
+            if spec.get(field) is not None and not isinstance(spec[field], str):
+                raise ValueError(f"{field} 必须是字符串")
+        if not spec.get('path'):
+            raise ValueError("缺少 path")
+        path = Path(spec['path'])
+        member = spec.get('member')
+        target_format = spec.get('format', 'MP3')
+        quality = spec.get('quality', '320k')
+        
+        if not path.is_file():
+            raise ValueError(f"文件不存在: {path}")
+        if member and not is_archive(path):
+            raise ValueError("指定 member 时 path 必须是压缩包")
+        if target_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"不支持的格式: {target_format}")
+        if quality not in QUALITY_OPTIONS:
+            raise ValueError(f"不支持的质量: {quality}")
+        try:
+            priority = int(spec.get('priority', 0))
+        except (TypeError, ValueError):
+            raise ValueError("priority 必须是整数")
+        output_dir = self.resolve_output_dir(spec.get('output_dir'))
+        suffix = SUPPORTED_FORMATS[target_format]
+        if member:
+            target = archive_output_path(output_dir, member, suffix)
+        else:
+            target = output_dir / (path.stem + suffix)
+        
+        with self.condition:
+            self.prune_jobs()
+            # 两个未结束的任务写同一个输出文件会互相覆盖
+            for other in self.jobs.values():
+                if other['target'] == str(target) and other['status'] not in self.FINAL_STATES:
+                    raise ValueError(f"输出文件 {target} 已被任务 {other['id']} 占用")
+            seq = next(self.counter)
+            job = {
+                'id': str(seq),
+                'path': str(path),
+                'member': member,
+                'format': target_format,
+                'quality': quality,
+                'priority': priority,
+                'output_dir': str(output_dir),
+                'target': str(target),
+                'output': None,
+                'status': 'queued',
+                'progress': 0.0,
+                'error': None,
+                'submitted': time.time(),
+                'version': 0
+            }
+            self.jobs[job['id']] = job
+            self.cancel_events[job['id']] = threading.Event()
+            heapq.heappush(self.pending, (-priority, seq, job['id']))
+            self.condition.notify_all()
+            return dict(job)
+    
+    def prune_jobs(self):
+        """清除结束超过保留时间或超出保留个数的任务（调用方需持有锁）"""
+        now = time.time()
+        finished = sorted((job.get('finished', job['submitted']), job_id)
+                          for job_id, job in self.jobs.items()
+                          if job['status'] in self.FINAL_STATES)
+        excess = len(finished) - self.MAX_FINISHED_JOBS
+        for index, (ended, job_id) in enumerate(finished):
+            if index < excess or now - ended > self.FINISHED_RETENTION:
+                del self.jobs[job_id]
+                del self.cancel_events[job_id]
+    
+    def resolve_output_dir(self, output_dir):
+        """把请求中的输出目录解析到服务输出根目录之下，越界时抛出ValueError"""
+        if not output_dir:
+            return self.output_dir
+        resolved = (self.output_dir / Path(output_dir).expanduser()).resolve()
+        if not resolved.is_relative_to(self.output_dir):
+            raise ValueError(f"output_dir 必须位于 {self.output_dir} 之内")
+        return resolved
+    
+    def get_job(self, job_id):
+        """返回任务快照，不存在时返回None"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def list_jobs(self):
+        """返回所有任务快照"""
+        with self.condition:
+            return [dict(job) for job in self.jobs.values()]
+    
+    def wait_for_update(self, job_id, version, timeout):
+        """等待任务状态变化（或超时），返回最新快照；任务已被清除时返回None"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            self.condition.wait_for(lambda: job['version'] != version, timeout)
+            return dict(job)
+    
+    def cancel(self, job_id):
+        """取消排队或运行中的任务，返回任务快照"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] not in self.FINAL_STATES:
+                self.cancel_events[job_id].set()
+                if job['status'] == 'queued':
+                    self.update(job, status='cancelled', finished=time.time())
+            return dict(job)
+    
+    def shutdown(self):
+        """取消所有未完成任务"""
+        with self.condition:
+            for job_id in list(self.jobs):
+                self.cancel(job_id)
+    
+    def update(self, job, **fields):
+        """更新任务字段并通知等待者"""
+        with self.condition:
+            job.update(fields)
+            job['version'] += 1
+            self.condition.notify_all()
+    
+    def worker_loop(self):
+        """工作线程：取出优先级最高的任务执行"""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                _, _, job_id = heapq.heappop(self.pending)
+                job = self.jobs.get(job_id)
+                if job is None or job['status'] != 'queued':
+                    continue
+                self.update(job, status='running', started=time.time())
+            self.run_job(job)
+    
+    def probe_duration(self, path):
+        """带缓存的时长探测，失败时返回None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (str(path), stat.st_mtime, stat.st_size)
+        if key not in self.probe_cache:
+            try:
+                self.probe_cache[key] = probe_audio(path)['duration'] or None
+            except (RuntimeError, OSError, ValueError, KeyError, subprocess.TimeoutExpired):
+                self.probe_cache[key] = None
+        return self.probe_cache[key]
+    
+    def run_job(self, job):
+        """执行单个任务"""
+        cancel_event = self.cancel_events[job['id']]
+        output_file = Path(job['target'])
+        duration = None
+        encoded = [0.0]
+        
+        def on_progress(seconds):
+            encoded[0] = seconds
+            if duration:
+                self.update(job, progress=round(min(seconds / duration, 1.0), 4))
+        
+        try:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            fast_info = None
+            if not job['member'] and self.fast_pcm and job['format'] == 'WAV':
+                fast_info = convert_pcm_fast(job['path'], output_file)
+            
+            if fast_info is not None:
+                duration = fast_info['duration']
+                returncode, stderr = 0, ''
+            elif job['member']:
+                cmd = build_ffmpeg_command('pipe:0', output_file, job['format'], job['quality'])
+                with open_archive_member(job['path'], job['member']) as stream:
+                    returncode, stderr = run_ffmpeg_monitored(cmd, on_progress, cancel_event, stream)
+                if returncode == 0 and ffmpeg_output_empty(stderr):
+                    returncode = 1
+                    stderr = "没有编码出任何音频（MP4/M4A等格式无法从压缩包流式读取）"
+            else:
+                # 压缩包成员走管道，无法预先探测时长
+                duration = self.probe_duration(job['path'])
+                cmd = build_ffmpeg_command(job['path'], output_file, job['format'], job['quality'])
+                returncode, stderr = run_ffmpeg_monitored(cmd, on_progress, cancel_event)
+        except Exception as e:
+            self.update(job, status='failed', error=str(e), finished=time.time())
+            return
+        
+        if cancel_event.is_set():
+            output_file.unlink(missing_ok=True)
+            self.update(job, status='cancelled', finished=time.time())
+        elif returncode == 0:
+            self.update(job, status='done', progress=1.0, output=str(output_file),
+                        finished=time.time())
+            # 无法预先探测时长的压缩包成员，用 -progress 报告的已编码时长
+            duration = duration or encoded[0]
+            if duration and output_file.exists():
+                self.throughput_model.record(job['format'], job['quality'], duration,
+                                             job['finished'] - job['started'],
+                                             output_file.stat().st_size)
+                self.throughput_model.save()
+        else:
+            self.update(job, status='failed', error=stderr[-300:], finished=time.time())
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """转换服务的HTTP接口
+    
+    GET    /formats            支持的格式与质量
+    GET    /jobs               所有任务
+    POST   /jobs               提交任务（JSON）
+    GET    /jobs/<id>          任务状态
+    GET    /jobs/<id>/events   以NDJSON流式推送进度，直到任务结束
+    DELETE /jobs/<id>          取消任务
+    
+    TCP上只接受Host为本机或允许列表中的请求，并拒绝来自其他来源的浏览器请求，
+    防止网页借用户的浏览器（含DNS重绑定）调用本服务。
+    """
+    
+    LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+    
+    def route(self):
+        return [part for part in urlparse(self.path).path.split('/') if part]
+    
+    def address_string(self):
+        # Unix套接字没有(主机, 端口)形式的客户端地址
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return 'unix'
+    
+    def check_origin(self):
+        """校验Host与Origin请求头，不通过时返回403并返回False"""
+        if not isinstance(self.client_address, tuple):
+            return True  # Unix套接字浏览器无法访问
+        allowed = self.server.allowed_hosts
+        host = urlparse('//' + self.headers.get('Host', '')).hostname
+        origin = self.headers.get('Origin')
+        if host not in allowed:
+            self.send_json(403, {'error': 'Host 不被允许'})
+            return False
+        if origin is not None and urlparse(origin).hostname not in allowed:
+            self.send_json(403, {'error': 'Origin 不被允许'})
+            return False
+        return True
+    
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        if not self.check_origin():
+            return
+        service = self.server.service
+        parts = self.route()
+        if parts == ['formats']:
+            self.send_json(200, {'formats': list(SUPPORTED_FORMATS), 'qualities': QUALITY_OPTIONS})
+        elif parts == ['jobs']:
+            self.send_json(200, service.list_jobs())
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = service.get_job(parts[1])
+            if job:
+                self.send_json(200, job)
+            else:
+                self.send_json(404, {'error': '任务不存在'})
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            self.stream_events(parts[1])
+        else:
+            self.send_json(404, {'error': '未知路径'})
+    
+    def do_POST(self):
+        if not self.check_origin():
+            return
+        if self.route() != ['jobs']:
+            self.send_json(404, {'error': '未知路径'})
+            return
+        # 只接受JSON：text/plain等表单类型属于无需预检的跨域简单请求
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_json(415, {'error': 'Content-Type 必须是 application/json'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            spec = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(spec, dict):
+                raise ValueError("请求体必须是JSON对象")
+            job = self.server.service.submit(spec)
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        self.send_json(201, job)
+    
+    def do_DELETE(self):
+        if not self.check_origin():
+            return
+        parts = self.route()
+        job = None
+        if len(parts) == 2 and parts[0] == 'jobs':
+            job = self.server.service.cancel(parts[1])
+        if job:
+            self.send_json(200, job)
+        else:
+            self.send_json(404, {'error': '任务不存在'})
+    
+    def stream_events(self, job_id):
+        """每次状态变化推送一行JSON；空闲时定期重发作为心跳"""
+        service = self.server.service
+        job = service.get_job(job_id)
+        if job is None:
+            self.send_json(404, {'error': '任务不存在'})
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                self.wfile.write(json.dumps(job, ensure_ascii=False).encode('utf-8') + b'\n')
+                self.wfile.flush()
+                if job['status'] in ConversionService.FINAL_STATES:
+                    break
+                job = service.wait_for_update(job_id, job['version'], timeout=15)
+                if job is None:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """TCP上的转换服务"""
+    daemon_threads = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class ServiceUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Unix套接字上的转换服务"""
+        daemon_threads = True
+
+
+def run_service(workers, output_dir, host='127.0.0.1', port=8765, socket_path=None, fast_pcm=False,
+                allowed_hosts=()):
+    """以服务模式运行，直到被中断
+    
+    输出只会写到 output_dir 之内；TCP上只接受本机名、监听地址和 allowed_hosts 作为Host/Origin。
+    """
+    service = ConversionService(workers, output_dir, fast_pcm)
+    if socket_path:
+        if not hasattr(socketserver, 'UnixStreamServer'):
+            raise SystemExit("当前平台不支持Unix套接字")
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ServiceUnixServer(socket_path, ServiceRequestHandler)
+        address = f"unix:{socket_path}"
+    else:
+        server = ServiceHTTPServer((host, port), ServiceRequestHandler)
+        address = f"http://{host}:{port}"
+    server.service = service
+    server.allowed_hosts = {name.lower() for name in ServiceRequestHandler.LOOPBACK_HOSTS}
+    server.allowed_hosts.update(name.lower().strip('[]') for name in allowed_hosts)
+    if host not in ('', '0.0.0.0', '::'):
+        server.allowed_hosts.add(host.lower().strip('[]'))
+    
+    print(f"转换服务已启动: {address} ({workers} 个工作线程)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
 def main():
+    parser = argparse.ArgumentParser(description="音频批量格式转换器")
+    parser.add_argument('--serve', action='store_true', help="以常驻服务模式运行（无界面）")
+    parser.add_argument('--host', default='127.0.0.1', help="服务监听地址")
+    parser.add_argument('--port', type=int, default=8765, help="服务监听端口")
+    parser.add_argument('--socket', help="改为监听此Unix套接字路径")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="服务工作线程数")
+    parser.add_argument('--output-dir', default=str(Path.home() / "ConvertedAudio"),
+                        help="服务输出根目录，任务的输出目录必须位于其中")
+    parser.add_argument('--allow-host', action='append', default=[],
+                        help="额外允许的Host/Origin主机名（可重复），监听非本机地址时使用")
+    parser.add_argument('--fast-pcm', action='store_true',
+                        help="服务对WAV/AIFF→WAV使用进程内NumPy快速通道")
+    args = parser.parse_args()
+    
+    if args.serve:
+        run_service(max(1, args.workers), args.output_dir, args.host, args.port, args.socket,
+                    args.fast_pcm, args.allow_host)
+        return
+    
     root = tk.Tk()
     app = BatchAudioConverterApp(root)
     root.mainloop()